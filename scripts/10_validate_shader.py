@@ -1,8 +1,9 @@
 import sys
 import os
-import subprocess
 import re
 import argparse
+import functools
+from pathlib import Path
 
 # ANSI Colors
 CYAN = "\033[96m"
@@ -10,82 +11,315 @@ GREEN = "\033[92m"
 YELLOW = "\033[93m"
 RED = "\033[91m"
 RESET = "\033[0m"
+if not sys.stdout.isatty():
+    # Piped or redirected: keep escape codes out of logs and reports
+    CYAN = GREEN = YELLOW = RED = RESET = ""
 
-def preprocess_shader(file_path, included_files=None, indent_level=0):
-    if included_files is None:
-        included_files = set()
-    
-    abs_path = os.path.abspath(file_path)
+# Base paths
+BASE_DIR = Path(__file__).parent.parent
+SHADER_DIR = BASE_DIR / "src/main/resources/assets/the-virus-block/shaders/post"
+
+# #include "path/to/file" (the whole directive line, including its newline)
+_INCLUDE_RE = re.compile(r'^[^\S\n]*#include[^\S\n]+"([^"\n]+)"[^\n]*\n?', re.MULTILINE)
+# Leading "ERROR: name:" / "WARNING: name:" of a glslang message
+_MESSAGE_FILE_RE = re.compile(r'^\w+: ([^:]+):')
+# Standard glsl uniforms (layout(...) uniform type name;)
+_UNIFORM_RE = re.compile(r'^\s*(layout\s*\([^)]+\)\s+)?uniform\s+(\w+)\s+(\w+)\s*;', re.MULTILINE)
+
+# Preprocessed sources are cached here, keyed by the mtimes of the include tree.
+# Per user and created 0700, so other local users cannot plant cache entries
+CACHE_DIR = os.path.expanduser("~/.cache/tvb-shader-preprocess")
+_CACHE_KEY_RE = re.compile(r'[0-9a-f]{32}')
+# Last successful validation per shader, used by validate_all() to skip
+# shaders whose include tree has not changed since
+RESULTS_FILE = os.path.expanduser("~/.cache/tvb-shader-validate.json")
+
+def preprocess_shader(file_path):
+    """Expand all #includes. Returns (source, deps) where deps are the absolute
+    paths of every file touched, including the root."""
+    included_files = set()
+    out = []
+    _expand(Path(file_path), out, included_files, 0)
+    return "".join(out), sorted(str(p) for p in included_files)
+
+def _expand(file_path, out, included_files, indent_level):
+    """Append the expansion of file_path to out. Every nesting level writes
+    into the same list, so each chunk of source is copied once, by the final
+    join in preprocess_shader()."""
+    abs_path = file_path.resolve()
     if abs_path in included_files:
-        return f"// SKIPPED CIRCULAR INCLUDE: {file_path}\n"
+        out.append(f"// SKIPPED CIRCULAR INCLUDE: {file_path}\n")
+        return
     
     included_files.add(abs_path)
-    base_dir = os.path.dirname(file_path)
-    processed_lines = []
+    base_dir = file_path.parent
     
     indent = "  " * indent_level
-    print(f"{indent}{CYAN}Processing: {os.path.basename(file_path)}{RESET}")
+    print(f"{indent}{CYAN}Processing: {file_path.name}{RESET}")
     
     try:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
+        spans, includes = _scan_file(abs_path)
     except FileNotFoundError:
         print(f"{indent}{RED}Error: Include file not found: {file_path}{RESET}")
-        return f"// ERROR: FILE NOT FOUND {file_path}\n"
-
-    for line_idx, line in enumerate(lines):
-        # Match #include "path/to/file"
-        match = re.match(r'^\s*#include\s+"([^"]+)"', line)
-        if match:
-            include_rel_path = match.group(1)
-            include_full_path = os.path.join(base_dir, include_rel_path)
-            
-            processed_lines.append(f"// >>> INCLUDE START: {include_rel_path}\n")
-            processed_lines.append(preprocess_shader(include_full_path, included_files, indent_level + 1))
-            processed_lines.append(f"// <<< INCLUDE END: {include_rel_path}\n")
-        else:
-            processed_lines.append(line)
+        out.append(f"// ERROR: FILE NOT FOUND {file_path}\n")
+        return
+
+    for span, include_rel_path in zip(spans, includes):
+        out.append(span)
+        out.append(f"// >>> INCLUDE START: {include_rel_path}\n")
+        _expand(base_dir / include_rel_path, out, included_files, indent_level + 1)
+        out.append(f"// <<< INCLUDE END: {include_rel_path}\n")
+    out.append(spans[-1])
+
+@functools.lru_cache(maxsize=None)
+def _scan_file(abs_path):
+    """Read a file and split it at its #include sites.
+    Returns (spans, includes) with len(spans) == len(includes) + 1.
+
+    Cached per process so headers shared by many shaders are read and scanned
+    once. Only the scan is cached, not the expansion: what an include expands
+    to depends on what the including root has already pulled in.
+    """
+    text = Path(abs_path).read_text(encoding='utf-8')
+    
+    # Most leaf headers include nothing; skip the regex for them
+    if '#include' not in text:
+        return (text,), ()
+
+    # Scan once for the (rare) include sites and keep the spans between them
+    spans = []
+    includes = []
+    last_end = 0
+    for match in _INCLUDE_RE.finditer(text):
+        spans.append(text[last_end:match.start()])
+        includes.append(match.group(1))
+        last_end = match.end()
+    spans.append(text[last_end:])
+    return tuple(spans), tuple(includes)
+
+def _dep_stamps(deps):
+    stamps = []
+    for path in deps:
+        try:
+            stamps.append((path, os.path.getmtime(path)))
+        except OSError:
+            stamps.append((path, None))
+    return stamps
+
+def _cache_dir():
+    """Create CACHE_DIR if needed. None if it cannot be used."""
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+    except OSError:
+        return None
+    return CACHE_DIR
+
+def _cache_key(root_path, deps):
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    h.update(root_path.encode())
+    for path, mtime in _dep_stamps(deps):
+        h.update(f"\0{path}\0{mtime}".encode())
+    return h.hexdigest()
+
+def _write_atomic(path, text):
+    """Write text to path via a temp file in the same directory, so readers
+    never see a partially written file."""
+    import tempfile
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".shadercache_")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def preprocess_cached(shader_path):
+    """preprocess_shader() backed by an on-disk cache.
+
+    The dependency list of each root is stored in a manifest together with the
+    cache key it was written under; on the next call the mtimes of those files
+    are re-stat'ed and, if the key still matches, the expanded source is read
+    back instead of re-walking the include tree. A rewrite removes the source
+    cached under the previous key.
+    """
+    import hashlib
+    import json
+    
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return preprocess_shader(shader_path)
+    root_path = str(Path(shader_path).resolve())
+    root_id = hashlib.blake2b(root_path.encode(), digest_size=16).hexdigest()
+    manifest = os.path.join(cache_dir, f"shadercache_{root_id}.deps")
+
+    old_key = None
+    try:
+        with open(manifest, 'r') as f:
+            cached = json.load(f)
+        old_key = cached["key"]
+        if _cache_key(root_path, cached["deps"]) == old_key:
+            with open(os.path.join(cache_dir, f"shadercache_{old_key}.frag"), 'r', encoding='utf-8') as f:
+                full_source = f.read()
+            # Stands in for the include tree preprocess_shader() would print
+            print(f"  {CYAN}(preprocessed source from cache; {len(cached['deps'])} files unchanged){RESET}")
+            return full_source, cached["deps"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    full_source, deps = preprocess_shader(shader_path)
+    key = _cache_key(root_path, deps)
+    try:
+        # Source first, then the manifest that points at it
+        _write_atomic(os.path.join(cache_dir, f"shadercache_{key}.frag"), full_source)
+        _write_atomic(manifest, json.dumps({"key": key, "deps": deps}))
+        if isinstance(old_key, str) and _CACHE_KEY_RE.fullmatch(old_key) and old_key != key:
+            os.unlink(os.path.join(cache_dir, f"shadercache_{old_key}.frag"))
+    except OSError:
+        pass
+    return full_source, deps
+
+def _only_whitespace_since_line_start(src, i):
+    k = i
+    while k > 0 and src[k - 1].isspace():
+        k -= 1
+    return k == 0 or '\n' in src[k:i]
+
+def _at_declaration_start(src, i):
+    """True if only whitespace, optionally followed by a layout(...)
+    qualifier, separates src[i] from the start of a line."""
+    if _only_whitespace_since_line_start(src, i):
+        return True
+    
+    # layout(...) followed by at least one whitespace character
+    k = i
+    while k > 0 and src[k - 1].isspace():
+        k -= 1
+    if k == i or src[k - 1] != ')':
+        return False
+    close_paren = k - 1
+    # The qualifier body may hold '(' but no ')', so any '(' since the
+    # previous ')' can be the one opening layout(...)
+    open_paren = src.find('(', src.rfind(')', 0, close_paren) + 1, close_paren - 1)
+    while open_paren != -1:
+        k = open_paren
+        while k > 0 and src[k - 1].isspace():
+            k -= 1
+        if k >= 6 and src.startswith('layout', k - 6) and _only_whitespace_since_line_start(src, k - 6):
+            return True
+        open_paren = src.find('(', open_paren + 1, close_paren - 1)
+    return False
+
+def _scan_uniform_blocks(src):
+    """Yield (block_name, member) for every ';'-separated member of every
+    'uniform Name { ... };' block.
+
+    Walks the source once with str.find instead of a backtracking regex, and
+    slices members out without materializing each block body first.
+    """
+    n = len(src)
+    i = src.find('uniform')
+    while i != -1:
+        next_search = i + 1
+        j = i + 7
+        if j < n and src[j].isspace() and _at_declaration_start(src, i):
+            while j < n and src[j].isspace():
+                j += 1
+            name_start = j
+            while j < n and (src[j].isalnum() or src[j] == '_'):
+                j += 1
+            block_name = src[name_start:j]
+            while j < n and src[j].isspace():
+                j += 1
             
-    return "".join(processed_lines)
+            if block_name and j < n and src[j] == '{':
+                close = src.find('}', j + 1)
+                if close > j + 1 and src.startswith(';', close + 1):
+                    pos = j + 1
+                    while True:
+                        semi = src.find(';', pos, close)
+                        if semi == -1:
+                            yield block_name, src[pos:close]
+                            break
+                        yield block_name, src[pos:semi]
+                        pos = semi + 1
+                    next_search = close + 2
+        i = src.find('uniform', next_search)
 
 def extract_uniforms(source_code):
     uniforms = []
-    # Regex for standard glsl uniforms (layout(...) uniform type name;)
-    pattern = re.compile(r'^\s*(layout\s*\([^)]+\)\s+)?uniform\s+(\w+)\s+(\w+)\s*;', re.MULTILINE)
-    
-    # Also handle uniform blocks
-    block_pattern = re.compile(r'^\s*(layout\s*\([^)]+\)\s+)?uniform\s+(\w+)\s*\{([^}]+)\};', re.MULTILINE)
     
-    for match in pattern.finditer(source_code):
+    for match in _UNIFORM_RE.finditer(source_code):
         uniforms.append({'type': match.group(2), 'name': match.group(3), 'block': False})
         
-    for match in block_pattern.finditer(source_code):
-        block_name = match.group(2)
-        block_content = match.group(3)
+    for block_name, line in _scan_uniform_blocks(source_code):
         # Naive extraction of members
-        for line in block_content.split(';'):
-            line = line.strip()
-            if not line or line.startswith('//'): continue
-            parts = line.split()
-            if len(parts) >= 2:
-                uniforms.append({'type': parts[-2], 'name': parts[-1], 'block': True, 'container': block_name})
+        line = line.strip()
+        if not line or line.startswith('//'): continue
+        parts = line.split()
+        if len(parts) >= 2:
+            uniforms.append({'type': parts[-2], 'name': parts[-1], 'block': True, 'container': block_name})
                 
     return uniforms
 
 def get_all_shaders():
     """Get all standalone .fsh shader files"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(script_dir)
-    shader_dir = os.path.join(project_root, "src", "main", "resources", "assets", "the-virus-block", "shaders", "post")
-    
-    shaders = []
-    if os.path.exists(shader_dir):
-        for f in sorted(os.listdir(shader_dir)):
-            if f.endswith('.fsh') and f.startswith(''):
-                shaders.append(os.path.join(shader_dir, f))
-    return shaders
-
-def validate_all():
+    return sorted(SHADER_DIR.glob('*.fsh'))
+
+def _load_results():
+    import json
+    try:
+        with open(RESULTS_FILE, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Anything but a {shader: entry} mapping is treated as no results
+    return state if isinstance(state, dict) else {}
+
+def _save_results(state):
+    import json
+    try:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, 'w') as f:
+            json.dump(state, f, indent=2)
+    except OSError:
+        pass
+
+def _validator_id():
+    """Identify the glslangValidator on PATH by its resolved path and --version
+    output, so results recorded with a different validator are not reused.
+    None if it is not installed."""
+    import shutil
+    import subprocess
+    
+    path = shutil.which('glslangValidator')
+    if path is None:
+        return None
+    try:
+        result = subprocess.run([path, '--version'], capture_output=True, text=True)
+    except OSError:
+        return None
+    return f"{os.path.realpath(path)}\n{result.stdout.strip()}"
+
+def _is_unchanged(entry, validator):
+    """True if a previous successful validation was done by the same validator
+    and every file it recorded still has the mtime it had back then. Malformed
+    entries count as changed."""
+    if validator is None or not isinstance(entry, dict) or entry.get("validator") != validator:
+        return False
+    try:
+        recorded = [(path, mtime) for path, mtime in entry["deps"]]
+    except (KeyError, TypeError, ValueError):
+        return False
+    if not all(isinstance(path, str) for path, _ in recorded):
+        return False
+    return _dep_stamps([path for path, _ in recorded]) == recorded
+
+def validate_all(force=False):
     """Validate all standalone shaders"""
     shaders = get_all_shaders()
     if not shaders:
@@ -94,15 +328,47 @@ def validate_all():
     
     print(f"{CYAN}════ VALIDATING {len(shaders)} SHADERS ════{RESET}\n")
     
+    # Skip shaders whose include tree is untouched since they last passed
+    # with this same validator
+    state = _load_results()
+    validator = _validator_id()
+    outcomes = {}
+    pending = []
+    for shader in shaders:
+        if not force and _is_unchanged(state.get(os.path.abspath(shader)), validator):
+            outcomes[shader] = (True, f"{GREEN}SKIP (cached){RESET}\n", None)
+        else:
+            pending.append(shader)
+    
+    # Validate everything with one glslang run; if that fails, glslang is
+    # CPU-bound, so fan out over all but one core. Either way each shader's
+    # output is captured and printed afterwards, in order.
+    if pending:
+        batch = _validate_batch(pending)
+        if batch is not None:
+            outcomes.update(batch)
+        else:
+            # Fall back to one glslang process per shader
+            from concurrent.futures import ProcessPoolExecutor
+            workers = max(1, (os.cpu_count() or 2) - 1)
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                outcomes.update(zip(pending, ex.map(_validate_one, pending)))
+    
     results = {}
     for shader in shaders:
-        name = os.path.basename(shader)
+        name = shader.name
+        success, output, entry = outcomes[shader]
         print(f"\n{CYAN}{'='*60}{RESET}")
         print(f"{CYAN}Validating: {name}{RESET}")
         print(f"{CYAN}{'='*60}{RESET}")
-        
-        success = validate(shader, quiet=False)
+        sys.stdout.write(output)
         results[name] = success
+        
+        if entry is not None:
+            state[os.path.abspath(shader)] = dict(entry, validator=validator)
+        elif not success:
+            state.pop(os.path.abspath(shader), None)
+    _save_results(state)
     
     # Summary
     print(f"\n{CYAN}{'='*60}{RESET}")
@@ -124,6 +390,151 @@ def validate_all():
         print(f"{RED}{failed} shaders failed, {passed} passed{RESET}")
         return False
 
+def _validate_one(shader_path):
+    """Process-pool worker: validate() with its output captured.
+    Returns (success, output, entry) where entry is the RESULTS_FILE record
+    for a successful run, else None."""
+    import contextlib
+    import io
+    
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        print(f"{CYAN}Processing: {os.path.basename(shader_path)}{RESET}")
+        full_source, deps = preprocess_cached(shader_path)
+        # Stamp the include tree before glslang runs, so an edit made
+        # meanwhile is picked up next time rather than masked
+        stamps = _dep_stamps(deps)
+        success = _validate_source(shader_path, full_source, quiet=False)
+    
+    entry = None
+    if success:
+        entry = {"deps": stamps}
+    return success, buf.getvalue(), entry
+
+def _validate_batch(shaders):
+    """Validate shaders with a single glslangValidator run instead of one
+    process per shader. Returns {shader: (success, output, entry)} like
+    _validate_one(), or None if glslang could not be run or its combined
+    output could not be attributed to individual files."""
+    import contextlib
+    import io
+    import shutil
+    import subprocess
+    import tempfile
+    
+    staged = {}
+    stage_dir = tempfile.mkdtemp(prefix="tvb_shaders_")
+    try:
+        for shader in shaders:
+            with contextlib.redirect_stdout(io.StringIO()):
+                full_source, deps = preprocess_cached(shader)
+            buf = [f"{CYAN}Processing: {os.path.basename(shader)}{RESET}\n"]
+            _format_analysis(buf, full_source, quiet=False)
+            
+            name = Path(shader).stem + ".frag"
+            with open(os.path.join(stage_dir, name), 'w', encoding='utf-8') as f:
+                f.write(full_source)
+            staged[name] = (shader, full_source, _dep_stamps(deps), buf)
+        
+        # Relative names keep glslang's "ERROR: name:line:" output parseable;
+        # -t compiles the files on multiple threads
+        cmd = ['glslangValidator', '-t', '-S', 'frag', '-C', *staged]
+        result = subprocess.run(cmd, cwd=stage_dir, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    finally:
+        shutil.rmtree(stage_dir, ignore_errors=True)
+    
+    # glslang prints each file name, then that file's messages. Route every
+    # line to the file it belongs to.
+    routed = {name: [] for name in staged}
+    current = None
+    for line in result.stdout.splitlines():
+        match = _MESSAGE_FILE_RE.match(line)
+        if line.strip() in staged:
+            current = line.strip()
+        elif match and match.group(1) in staged:
+            current = match.group(1)
+        elif current is None:
+            if line.strip():
+                return None
+            continue
+        routed[current].append(line)
+    
+    has_errors = {name: any("ERROR:" in line for line in lines) for name, lines in routed.items()}
+    if any(has_errors.values()) != (result.returncode != 0):
+        return None
+    
+    outcomes = {}
+    for name, (shader, full_source, stamps, buf) in staged.items():
+        success = _format_report(buf, shader, full_source, routed[name], has_errors[name], name)
+        entry = None
+        if success:
+            entry = {"deps": stamps}
+        outcomes[shader] = (success, "".join(buf), entry)
+    return outcomes
+
+def _format_analysis(buf, full_source, quiet):
+    # Analyze Uniforms (Static Analysis). Informational only, so skip the
+    # scan entirely when nothing would be shown.
+    if quiet:
+        return
+    buf.append(f"\n{CYAN}--- Static Analysis ---{RESET}\n")
+    uniforms = extract_uniforms(full_source)
+    buf.append(f"Found {len(uniforms)} active uniforms.\n")
+    
+    buf.append(f"\n{CYAN}--- GLSL Compilation Check ---{RESET}\n")
+
+def _relabel(line, source_name, label):
+    """Swap glslang's name for the source for label, only where glslang prints
+    it: the bare file-name header line and the "ERROR: name:line:" prefix."""
+    if line.strip() == source_name:
+        return label
+    match = _MESSAGE_FILE_RE.match(line)
+    if match and match.group(1) == source_name:
+        return line[:match.start(1)] + label + line[match.end(1):]
+    return line
+
+def _format_report(buf, shader_path, full_source, output_lines, has_errors, source_name):
+    """Append glslang's output for one shader, with errors in context, to buf.
+    source_name is how glslang referred to the source. Returns success."""
+    label = os.path.basename(shader_path) + " (Preprocessed)"
+    
+    # Single pass: colorize for display, remember raw ERROR lines
+    errors = []
+    for line in output_lines:
+        display = _relabel(line, source_name, label)
+        if "ERROR:" in line:
+            errors.append(line)
+            buf.append(f"{RED}{display}{RESET}\n")
+        elif "WARNING:" in line:
+            buf.append(f"{YELLOW}{display}{RESET}\n")
+        else:
+            buf.append(display + "\n")
+
+    if not has_errors:
+        buf.append(f"\n{GREEN}✅ VALIDATION SUCCEEDED{RESET}\n")
+        return True
+    
+    buf.append(f"\n{RED}❌ VALIDATION FAILED{RESET}\n")
+    # Context printing (only now is the source worth splitting)
+    source_lines = full_source.splitlines() if errors else []
+    for line in errors:
+        parts = line.split(':')
+        if len(parts) >= 3:
+            try:
+                line_num = int(parts[2])
+                buf.append(f"{YELLOW}   -> Context around line {line_num}:{RESET}\n")
+                start = max(0, line_num - 3)
+                end = min(len(source_lines), line_num + 2)
+                for i in range(start, end):
+                    marker = ">>" if i + 1 == line_num else "  "
+                    color = RED if i + 1 == line_num else RESET
+                    buf.append(f"   {marker} {color}{i+1}: {source_lines[i]}{RESET}\n")
+            except ValueError:
+                pass
+    return False
+
 def validate(shader_path, quiet=False):
     """Returns True if validation succeeded, False otherwise"""
     if not os.path.exists(shader_path):
@@ -133,91 +544,44 @@ def validate(shader_path, quiet=False):
     if not quiet:
         print(f"{CYAN}Processing: {os.path.basename(shader_path)}{RESET}")
     
-    full_source = preprocess_shader(shader_path)
-    
-    # Save to temp file
-    temp_file = "temp_validated_shader.frag"
-    with open(temp_file, 'w') as f:
-        f.write(full_source)
-        
-    # Analyze Uniforms (Static Analysis)
-    if not quiet:
-        print(f"\n{CYAN}--- Static Analysis ---{RESET}")
-    uniforms = extract_uniforms(full_source)
-    if not quiet:
-        print(f"Found {len(uniforms)} active uniforms.")
-    
-    # Run validator
-    if not quiet:
-        print(f"\n{CYAN}--- GLSL Compilation Check ---{RESET}")
+    full_source, _ = preprocess_cached(shader_path)
+    return _validate_source(shader_path, full_source, quiet)
+
+def _validate_source(shader_path, full_source, quiet):
+    """Analyze and compile the preprocessed source of shader_path and print
+    the report. Returns True if validation succeeded."""
+    import subprocess
     
-    success = False
+    # Collect the report and emit it with one write, so it stays contiguous
+    # when several validations share a stream
+    buf = []
+    _format_analysis(buf, full_source, quiet)
     try:
-        cmd = ['glslangValidator', '-S', 'frag', '-C', temp_file]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        output_lines = result.stdout.splitlines()
-        
-        clean_output = []
-        has_errors = result.returncode != 0
-        
-        for line in output_lines:
-            if temp_file in line:
-                line = line.replace(temp_file, os.path.basename(shader_path) + " (Preprocessed)")
-            
-            if "ERROR:" in line:
-                clean_output.append(f"{RED}{line}{RESET}")
-            elif "WARNING:" in line:
-                clean_output.append(f"{YELLOW}{line}{RESET}")
-            else:
-                clean_output.append(line)
-
-        # Print output
-        for line in clean_output:
-            print(line)
-
-        if has_errors:
-            print(f"\n{RED}❌ VALIDATION FAILED{RESET}")
-            # Context printing
-            for line in result.stdout.splitlines():
-                if "ERROR:" in line:
-                    parts = line.split(':')
-                    if len(parts) >= 3:
-                        try:
-                            line_num = int(parts[2])
-                            print(f"{YELLOW}   -> Context around line {line_num}:{RESET}")
-                            source_lines = full_source.splitlines()
-                            start = max(0, line_num - 3)
-                            end = min(len(source_lines), line_num + 2)
-                            for i in range(start, end):
-                                marker = ">>" if i + 1 == line_num else "  "
-                                color = RED if i + 1 == line_num else RESET
-                                print(f"   {marker} {color}{i+1}: {source_lines[i]}{RESET}")
-                        except ValueError:
-                            pass
-            success = False
-        else:
-            print(f"\n{GREEN}✅ VALIDATION SUCCEEDED{RESET}")
-            success = True
-            
+        # Pipe the source in rather than round-tripping through a temp file;
+        # glslang then refers to it as "stdin"
+        cmd = ['glslangValidator', '--stdin', '-S', 'frag', '-C']
+        result = subprocess.run(cmd, input=full_source, capture_output=True, text=True)
     except FileNotFoundError:
-        print(f"{RED}Error: glslangValidator not found.{RESET}")
+        buf.append(f"{RED}Error: glslangValidator not found.{RESET}\n")
         success = False
-    finally:
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+    else:
+        success = _format_report(buf, shader_path, full_source, result.stdout.splitlines(),
+                                 result.returncode != 0, "stdin")
     
+    sys.stdout.write("".join(buf))
+    sys.stdout.flush()
     return success
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Validate GLSL shaders with preprocessing')
     parser.add_argument('shader', nargs='?', help='Path to shader file to validate')
     parser.add_argument('--auto', action='store_true', help='Validate all standalone field_visual shaders')
+    parser.add_argument('--force', action='store_true', help='With --auto, revalidate shaders even if unchanged since they last passed')
     
     args = parser.parse_args()
     
     if args.auto:
-        success = validate_all()
+        success = validate_all(force=args.force)
         sys.exit(0 if success else 1)
     elif args.shader:
         success = validate(args.shader)
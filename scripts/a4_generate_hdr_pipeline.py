@@ -12,7 +12,9 @@ Usage:
 """
 
 import argparse
-import json
+import collections
+import copy
+import functools
 import sys
 from pathlib import Path
 
@@ -22,13 +24,119 @@ POST_EFFECT_DIR = BASE_DIR / "src/main/resources/assets/the-virus-block/post_eff
 SHADER_DIR = BASE_DIR / "src/main/resources/assets/the-virus-block/shaders/post"
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# GOD RAY UNIFORMS (Slots 50-57)
+# Appended to FieldVisualConfig. Templates only - copy before handing them out.
+# ═══════════════════════════════════════════════════════════════════════════
+_GOD_RAY_UNIFORMS = (
+    # Slot 50: God Ray params
+    {"name": "GodRayEnabled", "type": "float", "value": 0.0},
+    {"name": "GodRayDecay", "type": "float", "value": 0.97},
+    {"name": "GodRayExposure", "type": "float", "value": 0.02},
+    {"name": "GodRaySamples", "type": "float", "value": 96.0},
+    # Slot 51: God Ray mask params
+    {"name": "GodRayThreshold", "type": "float", "value": 0.5},
+    {"name": "GodRaySkyEnabled", "type": "float", "value": 0.0},
+    {"name": "GodRaySoftness", "type": "float", "value": 0.3},
+    {"name": "GodRayMaskReserved", "type": "float", "value": 0.0},
+    # Slot 52: God Ray style params
+    {"name": "GodRayEnergyMode", "type": "float", "value": 0.0},
+    {"name": "GodRayColorMode", "type": "float", "value": 0.0},
+    {"name": "GodRayDistributionMode", "type": "float", "value": 0.0},
+    {"name": "GodRayArrangementMode", "type": "float", "value": 0.0},
+    # Slot 53: God Ray color 2 (for gradient mode)
+    {"name": "GodRayColor2R", "type": "float", "value": 1.0},
+    {"name": "GodRayColor2G", "type": "float", "value": 0.9},
+    {"name": "GodRayColor2B", "type": "float", "value": 0.7},
+    {"name": "GodRayGradientPower", "type": "float", "value": 1.0},
+    # Slot 54: God Ray noise params
+    {"name": "GodRayNoiseScale", "type": "float", "value": 8.0},
+    {"name": "GodRayNoiseSpeed", "type": "float", "value": 0.5},
+    {"name": "GodRayNoiseIntensity", "type": "float", "value": 0.5},
+    {"name": "GodRayAngularBias", "type": "float", "value": 0.0},
+    # Slot 55: God Ray curvature (vortex/spiral/pinwheel)
+    {"name": "GodRayCurvatureMode", "type": "float", "value": 1.0},  # 1 = vortex
+    {"name": "GodRayCurvatureStrength", "type": "float", "value": 0.3},
+    {"name": "GodRayCurvatureSpeed", "type": "float", "value": 1.0},
+    {"name": "GodRayCurvatureReserved", "type": "float", "value": 0.0},
+    # Slot 56: God Ray flicker (animation modes)
+    {"name": "GodRayFlickerMode", "type": "float", "value": 0.0},
+    {"name": "GodRayFlickerIntensity", "type": "float", "value": 0.3},
+    {"name": "GodRayFlickerFrequency", "type": "float", "value": 2.0},
+    {"name": "GodRayWaveDistribution", "type": "float", "value": 0.0},
+    # Slot 57: God Ray travel (chase/scroll effects)
+    {"name": "GodRayTravelMode", "type": "float", "value": 0.0},
+    {"name": "GodRayTravelSpeed", "type": "float", "value": 1.0},
+    {"name": "GodRayTravelCount", "type": "float", "value": 3.0},
+    {"name": "GodRayTravelWidth", "type": "float", "value": 0.2},
+)
+
+_BLIT_CONFIG = (
+    {"name": "ColorModulate", "type": "vec4", "value": [1.0, 1.0, 1.0, 1.0]},
+)
+
+_BLUR_PARAMS_H = (
+    {"name": "DirectionX", "type": "float", "value": 1.0},
+    {"name": "DirectionY", "type": "float", "value": 0.0},
+    {"name": "BlurPad1", "type": "float", "value": 0.0},
+    {"name": "BlurPad2", "type": "float", "value": 0.0},
+)
+
+_BLUR_PARAMS_V = (
+    {"name": "DirectionX", "type": "float", "value": 0.0},
+    {"name": "DirectionY", "type": "float", "value": 1.0},
+    {"name": "BlurPad1", "type": "float", "value": 0.0},
+    {"name": "BlurPad2", "type": "float", "value": 0.0},
+)
+
+
+# Declarative description of one post-effect pass. A namedtuple rather than a
+# dataclass: importing dataclasses would cost more than the rest of startup.
+# inputs holds (sampler_name, target) or (sampler_name, target, use_depth_buffer)
+PassSpec = collections.namedtuple(
+    "PassSpec",
+    ["comment", "fragment_shader", "inputs", "output", "uniforms", "vertex_shader"],
+    defaults=(None, "minecraft:post/blit"),
+)
+
+
+def _build_pass(spec: PassSpec) -> dict:
+    """Materialize a PassSpec into the pass dict the post_effect JSON expects."""
+    inputs = []
+    for sampler_name, target, *depth in spec.inputs:
+        entry = {"sampler_name": sampler_name, "target": target}
+        if depth and depth[0]:
+            entry["use_depth_buffer"] = True
+        inputs.append(entry)
+    
+    pass_obj = {
+        "_comment": spec.comment,
+        "vertex_shader": spec.vertex_shader,
+        "fragment_shader": spec.fragment_shader,
+        "inputs": inputs,
+        "output": spec.output,
+    }
+    # An empty dict is still written out; only None means "no uniforms key"
+    if spec.uniforms is not None:
+        pass_obj["uniforms"] = spec.uniforms
+    return pass_obj
+
+
 def load_base_json(version: str) -> dict:
     """Load the base LDR JSON for a version."""
+    import json
+    
     json_path = POST_EFFECT_DIR / f"field_visual_{version}.json"
     if not json_path.exists():
         raise FileNotFoundError(f"Base JSON not found: {json_path}")
-    with open(json_path) as f:
-        return json.load(f)
+    # One read of the whole file; json decodes the UTF-8 bytes itself
+    return json.loads(json_path.read_bytes())
+
+
+@functools.lru_cache(maxsize=None)
+def _load_base_json_cached(version: str) -> dict:
+    """Parse each base JSON once per run. Treat the result as read-only."""
+    return load_base_json(version)
 
 
 def create_simple_chain(version: str, base_json: dict) -> dict:
@@ -40,7 +148,9 @@ def create_simple_chain(version: str, base_json: dict) -> dict:
     - RGBA16F intermediate buffer (via mixin)
     - No internal clamping (via HDR_MODE define)
     """
-    hdr_json = base_json.copy()
+    # Copy only the pass dicts we may modify; base_json is shared and read-only
+    hdr_json = dict(base_json)
+    hdr_json["passes"] = [dict(p) for p in base_json["passes"]]
     hdr_json["_comment"] = f"HDR Simple Chain - {version.upper()}"
     
     # Update first pass to use HDR shader
@@ -53,228 +163,204 @@ def create_simple_chain(version: str, base_json: dict) -> dict:
     return hdr_json
 
 
-def create_godrays_chain(version: str, base_json: dict) -> dict:
-    """
-    God Rays chain: HDR Effect + god ray passes.
-    
-    Pass 1: Effect → swap (HDR, procedural rays skipped when god rays enabled)
-    Pass 2: Blit swap → main
-    Pass 3: God Rays Mask → god_mask (depth-based occlusion)
-    Pass 4: God Rays Accum → god_accum (radial blur toward light)
-    Pass 5: God Rays Blur H → god_blur_h
-    Pass 6: God Rays Blur V → god_blur_v
-    Pass 7: God Rays Composite → main (blend god rays with scene)
-    
-    NOTE: When GodRayEnabled=0, the god ray passes early-out with passthrough.
-    HDR glow is achieved naturally through unclamped values - no separate glow pass needed.
-    """
+# Intermediate render targets of the god rays chain
+_GODRAYS_TARGETS = ("swap", "god_mask", "god_accum", "god_blur_h", "god_blur_v")
+
+
+def _godrays_base_pass(version: str, base_json: dict) -> dict:
+    """Pass 1: a copy of the base effect pass, shader swapped for HDR, god ray uniforms appended."""
     # Extract FieldVisualConfig uniforms from base pass
-    base_pass = base_json["passes"][0].copy()
+    base_pass = copy.deepcopy(base_json["passes"][0])
     field_visual_uniforms = base_pass.get("uniforms", {})
     
     # ═══════════════════════════════════════════════════════════════════════════
-    # INJECT GOD RAY UNIFORMS (Slots 50-54)
+    # INJECT GOD RAY UNIFORMS (Slots 50-57)
     # These are dynamically updated by PostEffectPassMixin but must be declared
     # in the JSON for Minecraft to create the uniform block with correct size.
     # ═══════════════════════════════════════════════════════════════════════════
-    god_ray_uniforms = [
-        # Slot 50: God Ray params
-        {"name": "GodRayEnabled", "type": "float", "value": 0.0},
-        {"name": "GodRayDecay", "type": "float", "value": 0.97},
-        {"name": "GodRayExposure", "type": "float", "value": 0.02},
-        {"name": "GodRaySamples", "type": "float", "value": 96.0},
-        # Slot 51: God Ray mask params
-        {"name": "GodRayThreshold", "type": "float", "value": 0.5},
-        {"name": "GodRaySkyEnabled", "type": "float", "value": 0.0},
-        {"name": "GodRaySoftness", "type": "float", "value": 0.3},
-        {"name": "GodRayMaskReserved", "type": "float", "value": 0.0},
-        # Slot 52: God Ray style params
-        {"name": "GodRayEnergyMode", "type": "float", "value": 0.0},
-        {"name": "GodRayColorMode", "type": "float", "value": 0.0},
-        {"name": "GodRayDistributionMode", "type": "float", "value": 0.0},
-        {"name": "GodRayArrangementMode", "type": "float", "value": 0.0},
-        # Slot 53: God Ray color 2 (for gradient mode)
-        {"name": "GodRayColor2R", "type": "float", "value": 1.0},
-        {"name": "GodRayColor2G", "type": "float", "value": 0.9},
-        {"name": "GodRayColor2B", "type": "float", "value": 0.7},
-        {"name": "GodRayGradientPower", "type": "float", "value": 1.0},
-        # Slot 54: God Ray noise params
-        {"name": "GodRayNoiseScale", "type": "float", "value": 8.0},
-        {"name": "GodRayNoiseSpeed", "type": "float", "value": 0.5},
-        {"name": "GodRayNoiseIntensity", "type": "float", "value": 0.5},
-        {"name": "GodRayAngularBias", "type": "float", "value": 0.0},
-        # Slot 55: God Ray curvature (vortex/spiral/pinwheel)
-        {"name": "GodRayCurvatureMode", "type": "float", "value": 1.0},  # 1 = vortex
-        {"name": "GodRayCurvatureStrength", "type": "float", "value": 0.3},
-        {"name": "GodRayCurvatureSpeed", "type": "float", "value": 1.0},
-        {"name": "GodRayCurvatureReserved", "type": "float", "value": 0.0},
-        # Slot 56: God Ray flicker (animation modes)
-        {"name": "GodRayFlickerMode", "type": "float", "value": 0.0},
-        {"name": "GodRayFlickerIntensity", "type": "float", "value": 0.3},
-        {"name": "GodRayFlickerFrequency", "type": "float", "value": 2.0},
-        {"name": "GodRayWaveDistribution", "type": "float", "value": 0.0},
-        # Slot 57: God Ray travel (chase/scroll effects)
-        {"name": "GodRayTravelMode", "type": "float", "value": 0.0},
-        {"name": "GodRayTravelSpeed", "type": "float", "value": 1.0},
-        {"name": "GodRayTravelCount", "type": "float", "value": 3.0},
-        {"name": "GodRayTravelWidth", "type": "float", "value": 0.2},
-    ]
     
     # Append god ray uniforms to FieldVisualConfig if not already present
     if "FieldVisualConfig" in field_visual_uniforms:
         existing_names = {u["name"] for u in field_visual_uniforms["FieldVisualConfig"]}
-        for u in god_ray_uniforms:
-            if u["name"] not in existing_names:
-                field_visual_uniforms["FieldVisualConfig"].append(u)
-    
-    # Build the pipeline
-    hdr_json = {
-        "_comment": f"HDR God Rays Chain - {version.upper()} with volumetric light shafts",
-        "targets": {
-            "swap": {},
-            "god_mask": {},
-            "god_accum": {},
-            "god_blur_h": {},
-            "god_blur_v": {}
-        },
-        "passes": []
-    }
+        field_visual_uniforms["FieldVisualConfig"].extend(
+            copy.deepcopy([u for u in _GOD_RAY_UNIFORMS if u["name"] not in existing_names])
+        )
     
-    # ═══════════════════════════════════════════════════════════════════════════
-    # Pass 1: Effect → swap
-    # ═══════════════════════════════════════════════════════════════════════════
+    # Pass 1: Effect → swap (reuses the base pass, shader swapped for HDR)
     base_pass["_comment"] = "Pass 1: HDR Effect → swap (procedural rays skipped when god rays enabled)"
     base_pass["fragment_shader"] = f"the-virus-block:post/hdr/field_visual_{version}_hdr"
     base_pass["output"] = "swap"
-    hdr_json["passes"].append(base_pass)
+    return base_pass
+
+
+def _godrays_passes(field_visual_uniforms) -> list:
+    """
+    Passes 2-7 (blit, god rays mask/accum/blur/composite). The god ray
+    passes each get their own copy of the FieldVisualConfig uniforms so no
+    two passes share (and can accidentally mutate) the same dicts.
+    """
+    pass_specs = [
+        PassSpec("Pass 2: Blit effect to main", "minecraft:post/blit",
+                 (("In", "swap"),), "minecraft:main",
+                 {"BlitConfig": copy.deepcopy(list(_BLIT_CONFIG))}),
+        # Needs FieldVisualConfig for threshold + sky toggle
+        PassSpec("Pass 3: God Rays Mask - brightness + depth to occlusion", "the-virus-block:post/hdr/god_rays_mask",
+                 (("Scene", "minecraft:main"), ("Depth", "minecraft:main", True)), "god_mask",
+                 copy.deepcopy(field_visual_uniforms)),
+        # Needs FieldVisualConfig for position + god ray params
+        PassSpec("Pass 4: God Rays Accumulate - radial blur toward light source", "the-virus-block:post/hdr/god_rays_accum",
+                 (("Occlusion", "god_mask"),), "god_accum",
+                 copy.deepcopy(field_visual_uniforms)),
+        PassSpec("Pass 5: God Rays Blur H", "the-virus-block:post/hdr/gaussian_blur",
+                 (("In", "god_accum"),), "god_blur_h",
+                 {"BlurParams": [dict(d) for d in _BLUR_PARAMS_H]}),
+        PassSpec("Pass 6: God Rays Blur V", "the-virus-block:post/hdr/gaussian_blur",
+                 (("In", "god_blur_h"),), "god_blur_v",
+                 {"BlurParams": [dict(d) for d in _BLUR_PARAMS_V]}),
+        # Needs FieldVisualConfig for ray color + god ray enabled check
+        PassSpec("Pass 7: God Rays Composite - blend god rays with scene", "the-virus-block:post/hdr/god_rays_composite",
+                 (("Scene", "minecraft:main"), ("GodRays", "god_blur_v")), "minecraft:main",
+                 copy.deepcopy(field_visual_uniforms)),
+    ]
+    return [_build_pass(spec) for spec in pass_specs]
+
+
+def _godrays_comment(version: str) -> str:
+    return f"HDR God Rays Chain - {version.upper()} with volumetric light shafts"
+
+
+def create_godrays_chain(version: str, base_json: dict) -> dict:
+    """
+    God Rays chain: HDR Effect + god ray passes.
     
-    # ═══════════════════════════════════════════════════════════════════════════
-    # Pass 2: Blit → main
-    # ═══════════════════════════════════════════════════════════════════════════
-    blit_pass = {
-        "_comment": "Pass 2: Blit effect to main",
-        "vertex_shader": "minecraft:post/blit",
-        "fragment_shader": "minecraft:post/blit",
-        "inputs": [{"sampler_name": "In", "target": "swap"}],
-        "output": "minecraft:main",
-        "uniforms": {
-            "BlitConfig": [
-                {"name": "ColorModulate", "type": "vec4", "value": [1.0, 1.0, 1.0, 1.0]}
-            ]
-        }
-    }
-    hdr_json["passes"].append(blit_pass)
+    Pass 1: Effect → swap (HDR, procedural rays skipped when god rays enabled)
+    Pass 2: Blit swap → main
+    Pass 3: God Rays Mask → god_mask (depth-based occlusion)
+    Pass 4: God Rays Accum → god_accum (radial blur toward light)
+    Pass 5: God Rays Blur H → god_blur_h
+    Pass 6: God Rays Blur V → god_blur_v
+    Pass 7: God Rays Composite → main (blend god rays with scene)
     
-    # ═══════════════════════════════════════════════════════════════════════════
-    # Pass 3: God Rays Mask (depth → occlusion)
-    # ═══════════════════════════════════════════════════════════════════════════
-    god_mask_pass = {
-        "_comment": "Pass 3: God Rays Mask - brightness + depth to occlusion",
-        "vertex_shader": "minecraft:post/blit",
-        "fragment_shader": "the-virus-block:post/hdr/god_rays_mask",
-        "inputs": [
-            {"sampler_name": "Scene", "target": "minecraft:main"},
-            {
-                "sampler_name": "Depth",
-                "target": "minecraft:main",
-                "use_depth_buffer": True
-            }
-        ],
-        "output": "god_mask",
-        "uniforms": field_visual_uniforms  # Needs FieldVisualConfig for threshold + sky toggle
-    }
-    hdr_json["passes"].append(god_mask_pass)
+    NOTE: When GodRayEnabled=0, the god ray passes early-out with passthrough.
+    HDR glow is achieved naturally through unclamped values - no separate glow pass needed.
+    """
+    base_pass = _godrays_base_pass(version, base_json)
     
-    # ═══════════════════════════════════════════════════════════════════════════
-    # Pass 4: God Rays Accumulate (radial blur toward light)
-    # ═══════════════════════════════════════════════════════════════════════════
-    god_accum_pass = {
-        "_comment": "Pass 4: God Rays Accumulate - radial blur toward light source",
-        "vertex_shader": "minecraft:post/blit",
-        "fragment_shader": "the-virus-block:post/hdr/god_rays_accum",
-        "inputs": [
-            {"sampler_name": "Occlusion", "target": "god_mask"}
-        ],
-        "output": "god_accum",
-        "uniforms": field_visual_uniforms  # Needs FieldVisualConfig for position + god ray params
+    hdr_json = {
+        "_comment": _godrays_comment(version),
+        "targets": {name: {} for name in _GODRAYS_TARGETS},
+        "passes": [base_pass] + _godrays_passes(base_pass.get("uniforms", {}))
     }
-    hdr_json["passes"].append(god_accum_pass)
     
-    # ═══════════════════════════════════════════════════════════════════════════
-    # Pass 5-6: God Rays Blur (soften the rays)
-    # ═══════════════════════════════════════════════════════════════════════════
-    god_blur_h_pass = {
-        "_comment": "Pass 5: God Rays Blur H",
-        "vertex_shader": "minecraft:post/blit",
-        "fragment_shader": "the-virus-block:post/hdr/gaussian_blur",
-        "inputs": [{"sampler_name": "In", "target": "god_accum"}],
-        "output": "god_blur_h",
-        "uniforms": {
-            "BlurParams": [
-                {"name": "DirectionX", "type": "float", "value": 1.0},
-                {"name": "DirectionY", "type": "float", "value": 0.0},
-                {"name": "BlurPad1", "type": "float", "value": 0.0},
-                {"name": "BlurPad2", "type": "float", "value": 0.0}
-            ]
-        }
-    }
-    hdr_json["passes"].append(god_blur_h_pass)
+    return hdr_json
+
+
+def _dumps(obj, compact: bool) -> str:
+    """Serialize to JSON text. Compact output uses orjson when it is installed."""
+    import json
+
+    if not compact:
+        # Match the 4-space layout of the committed assets so diffs stay readable
+        return json.dumps(obj, indent=4)
+    # orjson is optional and only used here, so don't import it at startup
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        # Raw UTF-8 like orjson, so --compact output doesn't depend on whether it is installed
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    return orjson.dumps(obj).decode("utf-8")
+
+
+def _dumps_nested(obj, compact: bool, depth: int) -> str:
+    """Serialize obj as it appears nested `depth` levels deep in an indented document."""
+    # Compact output has no newlines, so this is a no-op there
+    return _dumps(obj, compact).replace("\n", "\n" + " " * (4 * depth))
+
+
+@functools.lru_cache(maxsize=None)
+def _build_template(chain_type: str, compact: bool, has_uniforms: bool) -> tuple:
+    """
+    Serialize the version-independent skeleton of a chain once per process.
     
-    god_blur_v_pass = {
-        "_comment": "Pass 6: God Rays Blur V",
-        "vertex_shader": "minecraft:post/blit",
-        "fragment_shader": "the-virus-block:post/hdr/gaussian_blur",
-        "inputs": [{"sampler_name": "In", "target": "god_blur_h"}],
-        "output": "god_blur_v",
-        "uniforms": {
-            "BlurParams": [
-                {"name": "DirectionX", "type": "float", "value": 0.0},
-                {"name": "DirectionY", "type": "float", "value": 1.0},
-                {"name": "BlurPad1", "type": "float", "value": 0.0},
-                {"name": "BlurPad2", "type": "float", "value": 0.0}
-            ]
-        }
-    }
-    hdr_json["passes"].append(god_blur_v_pass)
+    Returns (spans, fields) with len(spans) == len(fields) + 1; a field is the
+    name of a per-version value to splice in between two spans. The field
+    values are strings, so they serialize as quoted placeholders that are
+    easy to split on.
+    """
+    import re
+
+    if chain_type != "godrays":
+        raise ValueError(f"No template for chain type: {chain_type}")
     
-    # ═══════════════════════════════════════════════════════════════════════════
-    # Pass 7: God Rays Composite (blend with scene)
-    # ═══════════════════════════════════════════════════════════════════════════
-    god_composite_pass = {
-        "_comment": "Pass 7: God Rays Composite - blend god rays with scene",
-        "vertex_shader": "minecraft:post/blit",
-        "fragment_shader": "the-virus-block:post/hdr/god_rays_composite",
-        "inputs": [
-            {"sampler_name": "Scene", "target": "minecraft:main"},
-            {"sampler_name": "GodRays", "target": "god_blur_v"}
-        ],
-        "output": "minecraft:main",
-        "uniforms": field_visual_uniforms  # Needs FieldVisualConfig for ray color + god ray enabled check
+    uniforms = "@@UNIFORMS@@" if has_uniforms else {}
+    skeleton = {
+        "_comment": "@@COMMENT@@",
+        "targets": {name: {} for name in _GODRAYS_TARGETS},
+        "passes": ["@@BASE_PASS@@"] + _godrays_passes(uniforms),
     }
-    hdr_json["passes"].append(god_composite_pass)
+    parts = re.split(r'"@@(\w+)@@"', _dumps(skeleton, compact))
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+
+def _render_godrays_chain(version: str, base_json: dict, compact: bool) -> str:
+    """Serialize the god rays chain by splicing per-version values into the template."""
+    base_pass = _godrays_base_pass(version, base_json)
+    uniforms = base_pass.get("uniforms", {})
+    spans, fields = _build_template("godrays", compact, bool(uniforms))
     
-    return hdr_json
+    # Passes sit at depth 2 (root -> "passes" -> pass), their uniforms at depth 3.
+    # The FieldVisualConfig uniforms repeat in four passes; serialize them once.
+    values = {
+        "COMMENT": _dumps(_godrays_comment(version), compact),
+        "BASE_PASS": _dumps_nested(base_pass, compact, 2),
+        "UNIFORMS": _dumps_nested(uniforms, compact, 3) if uniforms else None,
+    }
+    out = [spans[0]]
+    for name, span in zip(fields, spans[1:]):
+        out.append(values[name])
+        out.append(span)
+    return "".join(out)
 
 
-def generate_pipeline(version: str, chain_type: str) -> Path:
-    """Generate a pipeline JSON for the given version and chain type."""
-    base_json = load_base_json(version)
+def generate_pipeline(version: str, chain_type: str, compact: bool = False, legacy: bool = False) -> Path:
+    """
+    Generate a pipeline JSON for the given version and chain type.
+    
+    The god rays chain is spliced into a cached pre-serialized template;
+    legacy=True builds and serializes the full dict instead.
+    """
+    base_json = _load_base_json_cached(version)
     
     if chain_type == "simple":
-        hdr_json = create_simple_chain(version, base_json)
+        text = _dumps(create_simple_chain(version, base_json), compact)
+    elif chain_type == "godrays" and legacy:
+        text = _dumps(create_godrays_chain(version, base_json), compact)
     elif chain_type == "godrays":
-        hdr_json = create_godrays_chain(version, base_json)
+        text = _render_godrays_chain(version, base_json, compact)
     else:
         raise ValueError(f"Unknown chain type: {chain_type}")
     
-    # Write output
+    # Write output in one call instead of the many small chunks json.dump()
+    # streams; text mode keeps the platform's newline translation
     output_path = POST_EFFECT_DIR / f"field_visual_{version}_hdr.json"
-    with open(output_path, 'w') as f:
-        json.dump(hdr_json, f, indent=4)
+    output_path.write_text(text, encoding="utf-8")
     
     return output_path
 
 
+def _safe_generate(version: str, args: argparse.Namespace) -> tuple:
+    """Generate one version, returning (log line, is_error) instead of raising."""
+    try:
+        if args.dry_run:
+            return f"  Would generate: field_visual_{version}_hdr.json ({args.chain} chain)", False
+        output_path = generate_pipeline(version, args.chain, args.compact, args.legacy)
+        return f"  Generated: {output_path.name}", False
+    except FileNotFoundError as e:
+        return f"  ERROR: {e}", True
+    except Exception as e:
+        return f"  ERROR generating {version}: {e}", True
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate HDR post-effect pipelines")
     parser.add_argument("versions", help="Comma-separated list of versions (e.g., v5,v6,v7,v8)")
@@ -282,23 +368,27 @@ def main():
                         help="Chain type: simple (HDR effect only), godrays (HDR + volumetric light shafts)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Print what would be generated without writing files")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write minified JSON (uses orjson if installed) instead of 4-space indented")
+    parser.add_argument("--legacy", action="store_true",
+                        help="Build the god rays chain as a full dict instead of from the cached template")
     
     args = parser.parse_args()
-    versions = [v.strip() for v in args.versions.split(",")]
+    # Deduplicate (keeping order) so no two workers write the same file
+    versions = list(dict.fromkeys(v.strip() for v in args.versions.split(",")))
     
     print(f"Generating {args.chain} HDR pipelines for: {', '.join(versions)}")
     
-    for version in versions:
-        try:
-            if args.dry_run:
-                print(f"  Would generate: field_visual_{version}_hdr.json ({args.chain} chain)")
-            else:
-                output_path = generate_pipeline(version, args.chain)
-                print(f"  Generated: {output_path.name}")
-        except FileNotFoundError as e:
-            print(f"  ERROR: {e}", file=sys.stderr)
-        except Exception as e:
-            print(f"  ERROR generating {version}: {e}", file=sys.stderr)
+    if args.dry_run or len(versions) == 1:
+        results = [_safe_generate(v, args) for v in versions]
+    else:
+        # Versions are independent files; generate them concurrently, then log in input order
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(8, len(versions))) as executor:
+            results = list(executor.map(lambda v: _safe_generate(v, args), versions))
+    
+    for message, is_error in results:
+        print(message, file=sys.stderr if is_error else sys.stdout)
     
     print("Done!")
 
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for a4_generate_hdr_pipeline.py
+
+Run from the repo root:
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import contextlib
+import copy
+import hashlib
+import importlib.util
+import io
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+
+def _load(name, filename):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+a4 = _load("hdr_pipeline", "a4_generate_hdr_pipeline.py")
+
+# Digests of the output of the scripts as they were before the template work
+GOLDEN = json.loads((SCRIPTS_DIR / "tests/golden/baseline_digests.json").read_text(encoding="utf-8"))
+
+VERSIONS = ("v5", "v6", "v7", "v8")
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PipelineCase(unittest.TestCase):
+    """Generates into a scratch copy of POST_EFFECT_DIR with cold caches."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.post_effect_dir = Path(tmp.name) / "post_effect"
+        shutil.copytree(a4.POST_EFFECT_DIR, self.post_effect_dir)
+
+        patcher = mock.patch.object(a4, "POST_EFFECT_DIR", self.post_effect_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for cached in (a4._load_base_json_cached, a4._build_template):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+    def generate(self, version, chain_type, **kwargs):
+        return a4.generate_pipeline(version, chain_type, **kwargs).read_text(encoding="utf-8")
+
+
+class BaselineOutputTest(PipelineCase):
+
+    def test_godrays_matches_committed_assets(self):
+        for version in VERSIONS:
+            committed = (a4.POST_EFFECT_DIR / f"field_visual_{version}_hdr.json").read_text(encoding="utf-8")
+            for legacy in (False, True):
+                with self.subTest(version=version, legacy=legacy):
+                    self.assertEqual(self.generate(version, "godrays", legacy=legacy), committed)
+
+    def test_simple_matches_baseline(self):
+        for version in VERSIONS:
+            with self.subTest(version=version):
+                self.assertEqual(_digest(self.generate(version, "simple")), GOLDEN["simple_chain"][version])
+
+
+class TemplateTest(PipelineCase):
+    """The god rays template must serialize exactly like the full dict."""
+
+    def edge_bases(self):
+        v7 = a4.load_base_json("v7")
+        bases = {}
+        bases["no_uniforms"] = copy.deepcopy(v7)
+        bases["no_uniforms"]["passes"][0].pop("uniforms", None)
+        bases["empty_uniforms"] = copy.deepcopy(v7)
+        bases["empty_uniforms"]["passes"][0]["uniforms"] = {}
+        bases["no_field_visual_config"] = copy.deepcopy(v7)
+        bases["no_field_visual_config"]["passes"][0]["uniforms"] = {
+            "Other": [{"name": "x→é", "type": "float", "value": 1}]}
+        bases["god_ray_uniform_present"] = copy.deepcopy(v7)
+        bases["god_ray_uniform_present"]["passes"][0]["uniforms"]["FieldVisualConfig"].append(
+            {"name": "GodRayDecay", "type": "float", "value": 0.5})
+        bases["placeholder_lookalike"] = copy.deepcopy(v7)
+        bases["placeholder_lookalike"]["passes"][0]["_note"] = '"@@UNIFORMS@@"\n'
+        return bases
+
+    def test_template_matches_full_dict(self):
+        for name, base in self.edge_bases().items():
+            for compact in (False, True):
+                with self.subTest(base=name, compact=compact):
+                    self.assertEqual(a4._render_godrays_chain("v7", base, compact),
+                                     a4._dumps(a4.create_godrays_chain("v7", base), compact))
+
+    def test_keeps_empty_uniforms(self):
+        chain = a4.create_godrays_chain("v7", self.edge_bases()["empty_uniforms"])
+        passes = {p["output"]: p for p in chain["passes"]}
+        for output in ("swap", "god_mask", "god_accum"):
+            with self.subTest(output=output):
+                self.assertEqual(passes[output]["uniforms"], {})
+
+    def test_does_not_repeat_god_ray_uniforms(self):
+        chain = a4.create_godrays_chain("v7", self.edge_bases()["god_ray_uniform_present"])
+        for pass_obj in chain["passes"]:
+            names = [u["name"] for u in pass_obj.get("uniforms", {}).get("FieldVisualConfig", [])]
+            self.assertEqual(len(names), len(set(names)), pass_obj["_comment"])
+
+    def test_compact_output_does_not_depend_on_orjson(self):
+        bases = {version: a4.load_base_json(version) for version in VERSIONS}
+        bases.update(self.edge_bases())
+
+        def render_all():
+            a4._build_template.cache_clear()
+            return {name: a4._render_godrays_chain("v7", base, True) for name, base in bases.items()}
+
+        with_orjson = render_all()
+        # A None entry makes "import orjson" raise ImportError
+        with mock.patch.dict(sys.modules, {"orjson": None}):
+            without_orjson = render_all()
+        self.assertEqual(with_orjson, without_orjson)
+        for text in with_orjson.values():
+            json.loads(text)
+
+
+class MainTest(PipelineCase):
+
+    def run_main(self, *argv):
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", ["a4_generate_hdr_pipeline.py", *argv]), \
+                contextlib.redirect_stdout(out):
+            a4.main()
+        return out.getvalue()
+
+    def test_deduplicates_versions(self):
+        output = self.run_main("v7, v5,v7", "--dry-run")
+        self.assertIn("for: v7, v5\n", output)
+        self.assertEqual(output.count("Would generate: field_visual_v7_hdr.json"), 1)
+
+    def test_single_version_runs_without_a_pool(self):
+        with mock.patch("concurrent.futures.ThreadPoolExecutor", side_effect=AssertionError("pool started")):
+            output = self.run_main("v7,v7")
+        self.assertIn("Generated: field_visual_v7_hdr.json", output)
+
+    def test_multiple_versions_match_single_runs(self):
+        self.run_main(",".join(VERSIONS), "--chain", "godrays")
+        for version in VERSIONS:
+            committed = (a4.POST_EFFECT_DIR / f"field_visual_{version}_hdr.json").read_text(encoding="utf-8")
+            with self.subTest(version=version):
+                self.assertEqual((self.post_effect_dir / f"field_visual_{version}_hdr.json").read_text(encoding="utf-8"),
+                                 committed)
+
+
+if __name__ == "__main__":
+    unittest.main()
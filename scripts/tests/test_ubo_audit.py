@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for ubo_audit.py
+
+Run from the repo root:
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+REPO_DIR = SCRIPTS_DIR.parent
+SHADER_DIR = REPO_DIR / "src/main/resources/assets/the-virus-block/shaders/post"
+
+
+def _load(name, filename):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+ua = _load("ubo_audit", "ubo_audit.py")
+
+# Digests of the output of the scripts as they were before the caching work
+GOLDEN = json.loads((SCRIPTS_DIR / "tests/golden/baseline_digests.json").read_text(encoding="utf-8"))
+
+
+def _digest(text):
+    """sha256 of text with the repo root written as ROOT, as in GOLDEN"""
+    return hashlib.sha256(text.replace(str(REPO_DIR), "ROOT").encode("utf-8")).hexdigest()
+
+
+class BaselineOutputTest(unittest.TestCase):
+    """Preprocessing and reports for the shipped shaders are unchanged from
+    before the scan cache and streamed report work."""
+
+    def test_preprocess_matches_baseline(self):
+        shaders = {str(p.relative_to(SHADER_DIR)): p for p in sorted(SHADER_DIR.rglob("*.fsh"))}
+        self.assertEqual(sorted(shaders), sorted(GOLDEN["preprocess"]))
+        for name, path in shaders.items():
+            with self.subTest(shader=name):
+                self.assertEqual(_digest(ua.preprocess_shader(str(path))), GOLDEN["preprocess"][name])
+
+    def test_reports_match_baseline(self):
+        for key, digest in GOLDEN["ubo_reports"].items():
+            name, _, block_name = key.partition(":")
+            with self.subTest(report=key), contextlib.redirect_stdout(io.StringIO()):
+                content = ua.preprocess_shader(str(SHADER_DIR / name))
+                parameters = ua.parse_glsl_uniform_block(content, block_name or None)
+                report = ua.render_markdown_report(parameters, name, "X")
+                self.assertEqual(_digest(report.rstrip("\n")), digest)
+
+
+class ScanCacheTest(unittest.TestCase):
+
+    def test_edited_include_is_rescanned(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            header = Path(tmp) / "common.glsl"
+            shader = Path(tmp) / "main.fsh"
+            header.write_text("float before;\n", encoding="utf-8")
+            shader.write_text('#include "common.glsl"\nvoid main() {}\n', encoding="utf-8")
+            self.assertIn("float before;", ua.preprocess_shader(str(shader)))
+
+            header.write_text("float after;\n", encoding="utf-8")
+            stat = header.stat()
+            os.utime(header, (stat.st_atime, stat.st_mtime + 10))
+            content = ua.preprocess_shader(str(shader))
+            self.assertIn("float after;", content)
+            self.assertNotIn("float before;", content)
+
+
+if __name__ == "__main__":
+    unittest.main()
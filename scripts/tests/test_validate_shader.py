@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Tests for 10_validate_shader.py
+
+Run from the repo root:
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+
+def _load(name, filename):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+vs = _load("validate_shader", "10_validate_shader.py")
+
+# Digests of the output of the scripts as they were before the caching work
+GOLDEN = json.loads((SCRIPTS_DIR / "tests/golden/baseline_digests.json").read_text(encoding="utf-8"))
+
+
+def _digest(text):
+    """sha256 of text with the repo root written as ROOT, as in GOLDEN"""
+    return hashlib.sha256(text.replace(str(vs.BASE_DIR), "ROOT").encode("utf-8")).hexdigest()
+
+# Stand-in for glslangValidator. Every line containing FAKE_ERROR is reported
+# as an error. In file mode all "name" header lines come first and the
+# messages follow in reverse file order, so they can only be attributed by
+# the name in their "ERROR: name:line:" prefix. FAKE_GLSLANG_MODE=garbage
+# prints an unattributable line first; =bad_rc exits 0 despite errors.
+# FAKE_GLSLANG_VERSION changes what --version reports.
+FAKE_VALIDATOR = textwrap.dedent("""\
+    import os, sys
+    args = sys.argv[1:]
+    if '--version' in args:
+        print('Glslang Version: ' + os.environ.get('FAKE_GLSLANG_VERSION', 'fake'))
+        sys.exit(0)
+    mode = os.environ.get('FAKE_GLSLANG_MODE', '')
+    if '--stdin' in args:
+        sources = [('stdin', sys.stdin.read())]
+    else:
+        names = [a for a in args if not a.startswith('-') and a != 'frag']
+        sources = [(n, open(n, encoding='utf-8').read()) for n in names]
+    if mode == 'garbage':
+        print('glslang: something unexpected')
+    messages = []
+    for name, src in sources:
+        for i, line in enumerate(src.splitlines(), 1):
+            if 'FAKE_ERROR' in line:
+                messages.append(f"ERROR: {name}:{i}: 'FAKE_ERROR' : undeclared identifier")
+    for name, _ in sources:
+        print(name)
+    for message in reversed(messages):
+        print(message)
+    sys.exit(2 if messages and mode != 'bad_rc' else 0)
+""")
+
+OK_SOURCE = "#version 150\nvoid main() {}\n"
+
+
+class FakeValidatorCase(unittest.TestCase):
+    """Puts the fake validator first on PATH and isolates the on-disk caches."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+        bin_dir = self.tmp / "bin"
+        bin_dir.mkdir()
+        fake = bin_dir / "glslangValidator"
+        fake.write_text(f"#!{sys.executable}\n" + FAKE_VALIDATOR)
+        fake.chmod(0o755)
+
+        self.shader_dir = self.tmp / "shaders"
+        self.shader_dir.mkdir()
+
+        for patcher in (
+            mock.patch.dict(os.environ, {"PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}),
+            mock.patch.object(vs, "CACHE_DIR", str(self.tmp / "cache")),
+            mock.patch.object(vs, "RESULTS_FILE", str(self.tmp / "results.json")),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        vs._scan_file.cache_clear()
+        self.addCleanup(vs._scan_file.cache_clear)
+
+    def write_shader(self, name, source):
+        path = self.shader_dir / name
+        path.write_text(source, encoding="utf-8")
+        return path
+
+
+@unittest.skipIf(os.name == "nt", "fake validator is a POSIX script")
+class BatchValidationTest(FakeValidatorCase):
+
+    def setUp(self):
+        super().setUp()
+        self.shaders = [
+            self.write_shader("a.fsh", OK_SOURCE),
+            self.write_shader("b.fsh", "#version 150\nvoid main() {\n    FAKE_ERROR;\n}\n"),
+            self.write_shader("c.fsh", OK_SOURCE),
+            self.write_shader("d.fsh", "#version 150\nFAKE_ERROR;\nvoid main() {\n    FAKE_ERROR;\n}\n"),
+        ]
+
+    def test_routes_interleaved_messages_to_their_shader(self):
+        outcomes = vs._validate_batch(self.shaders)
+        self.assertIsNotNone(outcomes)
+        a, b, c, d = (outcomes[shader] for shader in self.shaders)
+
+        for success, output, entry in (a, c):
+            self.assertTrue(success)
+            self.assertIsNotNone(entry)
+            self.assertNotIn("ERROR", output)
+        for success, _, entry in (b, d):
+            self.assertFalse(success)
+            self.assertIsNone(entry)
+
+        self.assertEqual(b[1].count("ERROR:"), 1)
+        self.assertIn("ERROR: b.fsh (Preprocessed):3:", b[1])
+        self.assertEqual(d[1].count("ERROR:"), 2)
+        self.assertIn("ERROR: d.fsh (Preprocessed):2:", d[1])
+        self.assertIn("ERROR: d.fsh (Preprocessed):4:", d[1])
+
+    def test_matches_per_shader_validation(self):
+        outcomes = vs._validate_batch(self.shaders)
+        for shader in self.shaders:
+            success, output, _ = vs._validate_one(shader)
+            errors = [line for line in output.splitlines() if line.startswith("ERROR:")]
+            batch_errors = [line for line in outcomes[shader][1].splitlines() if line.startswith("ERROR:")]
+            self.assertEqual(success, outcomes[shader][0], shader.name)
+            self.assertEqual(sorted(errors), sorted(batch_errors), shader.name)
+
+    def test_gives_up_on_unattributable_output(self):
+        with mock.patch.dict(os.environ, {"FAKE_GLSLANG_MODE": "garbage"}):
+            self.assertIsNone(vs._validate_batch(self.shaders))
+
+    def test_gives_up_when_exit_status_disagrees_with_messages(self):
+        with mock.patch.dict(os.environ, {"FAKE_GLSLANG_MODE": "bad_rc"}):
+            self.assertIsNone(vs._validate_batch(self.shaders))
+
+
+class PreprocessCacheTest(FakeValidatorCase):
+
+    def setUp(self):
+        super().setUp()
+        self.header = self.write_shader("common.glsl", "float common;\n")
+        self.shader = self.write_shader("main.fsh", '#version 150\n#include "common.glsl"\nvoid main() {}\n')
+        self.cache = Path(vs.CACHE_DIR)
+
+    def preprocess(self):
+        """preprocess_cached() as a fresh process would run it: (result, printed output)"""
+        vs._scan_file.cache_clear()
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            result = vs.preprocess_cached(str(self.shader))
+        return result, out.getvalue()
+
+    def expected(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return vs.preprocess_shader(str(self.shader))
+
+    def touch_header(self, source):
+        self.header.write_text(source, encoding="utf-8")
+        stat = self.header.stat()
+        os.utime(self.header, (stat.st_atime, stat.st_mtime + 10))
+
+    def manifest(self):
+        (manifest,) = self.cache.glob("*.deps")
+        return manifest
+
+    def test_miss_then_hit(self):
+        result, output = self.preprocess()
+        self.assertEqual(result, self.expected())
+        self.assertNotIn("from cache", output)
+        self.assertIn("Processing: common.glsl", output)
+
+        result, output = self.preprocess()
+        self.assertEqual(result, self.expected())
+        self.assertIn("(preprocessed source from cache; 2 files unchanged)", output)
+        self.assertNotIn("Processing:", output)
+
+    def test_header_edit_replaces_cached_source(self):
+        self.preprocess()
+        self.touch_header("float edited;\n")
+
+        (source, _), output = self.preprocess()
+        self.assertNotIn("from cache", output)
+        self.assertIn("float edited;", source)
+        # The source cached under the old key is removed, not left to pile up
+        self.assertEqual(len(list(self.cache.glob("*.frag"))), 1)
+
+        (source, _), output = self.preprocess()
+        self.assertIn("from cache", output)
+        self.assertIn("float edited;", source)
+
+    def test_malformed_manifest_is_a_miss(self):
+        self.preprocess()
+        manifest = self.manifest()
+        for text in ("", "{", "null", '["key"]', '{"deps": []}', '{"key": 1, "deps": 2}',
+                     '{"key": "0123", "deps": [3]}', '{"key": "0123", "deps": ["/nonexistent"]}'):
+            with self.subTest(manifest=text):
+                manifest.write_text(text, encoding="utf-8")
+                result, output = self.preprocess()
+                self.assertEqual(result, self.expected())
+                self.assertNotIn("from cache", output)
+                # Rewritten, so the next run hits again
+                self.assertIn("from cache", self.preprocess()[1])
+
+    def test_missing_cached_source_is_a_miss(self):
+        self.preprocess()
+        for frag in self.cache.glob("*.frag"):
+            frag.unlink()
+        result, output = self.preprocess()
+        self.assertEqual(result, self.expected())
+        self.assertNotIn("from cache", output)
+
+    def test_does_not_unlink_outside_the_cache(self):
+        self.preprocess()
+        victim = self.tmp / "victim.frag"
+        victim.write_text("keep me", encoding="utf-8")
+        # shadercache_{key}.frag resolves to the victim once shadercache_/ exists
+        (self.cache / "shadercache_").mkdir()
+        self.manifest().write_text(json.dumps({"key": "/../../victim", "deps": []}), encoding="utf-8")
+        self.preprocess()
+        self.assertTrue(victim.exists())
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_cache_dir_is_private(self):
+        self.preprocess()
+        self.assertEqual(self.cache.stat().st_mode & 0o777, 0o700)
+
+    def test_unusable_cache_dir_falls_back(self):
+        blocker = self.tmp / "not_a_dir"
+        blocker.write_text("", encoding="utf-8")
+        with mock.patch.object(vs, "CACHE_DIR", str(blocker / "cache")):
+            result, output = self.preprocess()
+        self.assertEqual(result, self.expected())
+        self.assertNotIn("from cache", output)
+
+
+class ResultsCacheTest(FakeValidatorCase):
+
+    def test_load_results_ignores_malformed_files(self):
+        for text in ("", "{", "null", "[]", '"text"', "42"):
+            with self.subTest(results=text):
+                Path(vs.RESULTS_FILE).write_text(text, encoding="utf-8")
+                self.assertEqual(vs._load_results(), {})
+
+    def test_is_unchanged_rejects_malformed_entries(self):
+        shader = self.write_shader("a.fsh", OK_SOURCE)
+        good = {"deps": vs._dep_stamps([str(shader)]), "validator": "v1"}
+        self.assertTrue(vs._is_unchanged(good, "v1"))
+        self.assertFalse(vs._is_unchanged(good, "v2"))
+        self.assertFalse(vs._is_unchanged(good, None))
+        for entry in (None, "text", [], {}, {"validator": "v1"},
+                      {"deps": None, "validator": "v1"},
+                      {"deps": 5, "validator": "v1"},
+                      {"deps": [[str(shader)]], "validator": "v1"},
+                      {"deps": [[str(shader), 1, 2]], "validator": "v1"},
+                      {"deps": ["ab"], "validator": "v1"},
+                      {"deps": [[5, 1.0]], "validator": "v1"},
+                      {"deps": [[["list"], 1.0]], "validator": "v1"}):
+            with self.subTest(entry=entry):
+                self.assertFalse(vs._is_unchanged(entry, "v1"))
+
+
+@unittest.skipIf(os.name == "nt", "fake validator is a POSIX script")
+class ValidateAllTest(FakeValidatorCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_shader("a.fsh", OK_SOURCE)
+        self.write_shader("b.fsh", OK_SOURCE)
+        patcher = mock.patch.object(vs, "SHADER_DIR", self.shader_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def validate_all(self):
+        vs._scan_file.cache_clear()
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            passed = vs.validate_all()
+        return passed, out.getvalue()
+
+    def test_skips_unchanged_shaders(self):
+        passed, output = self.validate_all()
+        self.assertTrue(passed)
+        self.assertNotIn("SKIP (cached)", output)
+
+        passed, output = self.validate_all()
+        self.assertTrue(passed)
+        self.assertEqual(output.count("SKIP (cached)"), 2)
+
+    def test_revalidates_after_an_edit(self):
+        self.validate_all()
+        shader = self.shader_dir / "b.fsh"
+        stat = shader.stat()
+        os.utime(shader, (stat.st_atime, stat.st_mtime + 10))
+        _, output = self.validate_all()
+        self.assertEqual(output.count("SKIP (cached)"), 1)
+
+    def test_revalidates_with_a_different_validator(self):
+        self.validate_all()
+        with mock.patch.dict(os.environ, {"FAKE_GLSLANG_VERSION": "upgraded"}):
+            _, output = self.validate_all()
+            self.assertNotIn("SKIP (cached)", output)
+            _, output = self.validate_all()
+            self.assertEqual(output.count("SKIP (cached)"), 2)
+
+    def test_survives_malformed_results_file(self):
+        results = Path(vs.RESULTS_FILE)
+        for text in ("{", "[]", "null", '{"x": 1}',
+                     json.dumps({str(self.shader_dir / "a.fsh"): {"deps": None}}),
+                     json.dumps({str(self.shader_dir / "a.fsh"): {"deps": [[1]], "hash": "x"}}),
+                     json.dumps({str(self.shader_dir / "a.fsh"): "text"})):
+            with self.subTest(results=text):
+                results.write_text(text, encoding="utf-8")
+                passed, output = self.validate_all()
+                self.assertTrue(passed)
+                self.assertNotIn("SKIP (cached)", output)
+                state = json.loads(results.read_text(encoding="utf-8"))
+                self.assertTrue(all(vs._is_unchanged(state[str(self.shader_dir / name)], vs._validator_id())
+                                    for name in ("a.fsh", "b.fsh")))
+
+
+class BaselineOutputTest(unittest.TestCase):
+    """Preprocessing and uniform extraction of the shipped shaders are
+    unchanged from before the include caching work."""
+
+    def test_preprocess_matches_baseline(self):
+        shaders = {str(p.relative_to(vs.SHADER_DIR)): p for p in sorted(vs.SHADER_DIR.rglob("*.fsh"))}
+        self.assertEqual(sorted(shaders), sorted(GOLDEN["preprocess"]))
+        vs._scan_file.cache_clear()
+        for name, path in shaders.items():
+            with self.subTest(shader=name), contextlib.redirect_stdout(io.StringIO()):
+                source, _ = vs.preprocess_shader(str(path))
+                self.assertEqual(_digest(source), GOLDEN["preprocess"][name])
+                uniforms = vs.extract_uniforms(source)
+                self.assertEqual(_digest(json.dumps(uniforms, sort_keys=True)), GOLDEN["uniforms"][name])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,9 +16,12 @@ import re
 import sys
 import os
 import argparse
+import io
+from itertools import groupby
+from operator import attrgetter
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Callable, Optional, List
 
 # ANSI Colors
 CYAN = "\033[96m"
@@ -26,8 +29,27 @@ GREEN = "\033[92m"
 YELLOW = "\033[93m"
 RED = "\033[91m"
 RESET = "\033[0m"
+if not sys.stdout.isatty():
+    # Piped or redirected: keep escape codes out of logs and reports
+    CYAN = GREEN = YELLOW = RED = RESET = ""
 
-@dataclass
+# Precompiled patterns (hot in the per-line parse loop)
+# Whole #include line, newline included, so the text can be spliced around it
+_RE_INCLUDE = re.compile(r'^[^\S\n]*#include[^\S\n]+"([^"\n]+)"[^\n]*\n?', re.MULTILINE)
+_RE_BLOCK_START = re.compile(r'layout\s*\(\s*std140\s*\)\s*uniform\s+(\w+)\s*\{')
+# Slot comments: "// vec4 N: ..." or "// mat4 (vec4 N-M): ..."
+_RE_SLOT = re.compile(r'//\s*(?:vec4\s+(?P<vec4>\d+):|mat4\s*\(vec4\s*(?P<mat4>\d+)-\d+\):)')
+# Declarations: "float|mat4|vec2-4 name; // comment", dispatched on the type group
+_DECL_PREFIXES = ('float', 'mat4', 'vec')
+_RE_DECL = re.compile(r'(?:(?P<float>float)|(?P<mat4>mat4)|(?P<vec>vec[234]))\s+(?P<name>\w+)\s*;\s*(?://\s*(?P<comment>.*))?')
+
+# Classification keywords, matched against the lowercased parameter name
+_RE_CAMERA = re.compile(r'camera[xyz]|forward[xyz]|up[xyz]|fov|aspectratio|nearplane|farplane|viewproj')
+_RE_POS = re.compile(r'center[xyz]|radius')
+_RE_DEBUG = re.compile(r'debug|reserved')
+_RE_PER_FRAME = re.compile(r'camera|forward|up|viewproj')
+
+@dataclass(slots=True)
 class Parameter:
     """Represents a single UBO parameter"""
     slot: int
@@ -35,22 +57,28 @@ class Parameter:
     glsl_type: str
     section: str
     comment: str = ""
+    _domain: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _update_freq: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     def to_row(self) -> str:
         """Convert to markdown table row with classification columns"""
-        domain = self._guess_domain()
-        update_freq = self._guess_update_freq()
+        domain, update_freq = self._classify()
         
         return f"| {self.slot} | `{self.name}` | {self.section} | {domain} | {update_freq} | {self.comment} |"
     
-    def _guess_domain(self) -> str:
-        """Heuristic guess at target domain"""
-        name_lower = self.name.lower()
-        
+    def _classify(self) -> tuple[str, str]:
+        """Heuristic guess at (target domain, update frequency), computed once then cached"""
+        if self._domain is None:
+            name_lower = self.name.lower()
+            is_pos = _RE_POS.search(name_lower) is not None
+            self._domain = self._classify_domain(name_lower, is_pos)
+            self._update_freq = self._classify_update_freq(name_lower, is_pos)
+        return self._domain, self._update_freq
+    
+    @staticmethod
+    def _classify_domain(name_lower: str, is_pos: bool) -> str:
         # Camera-related
-        if any(x in name_lower for x in ['camerax', 'cameray', 'cameraz', 'forwardx', 'forwardy', 'forwardz', 
-                                           'upx', 'upy', 'upz', 'fov', 'aspectratio', 'nearplane', 'farplane', 
-                                           'viewproj', 'invviewproj']):
+        if _RE_CAMERA.search(name_lower):
             return "**Camera**"
         
         # Frame-related
@@ -58,11 +86,11 @@ class Parameter:
             return "**Frame**"
         
         # Position/Instance
-        if any(x in name_lower for x in ['centerx', 'centery', 'centerz', 'radius']):
+        if is_pos:
             return "EffectRuntime?"
         
         # Debug
-        if 'debug' in name_lower or 'reserved' in name_lower:
+        if _RE_DEBUG.search(name_lower):
             return "Debug/Reserved"
         
         # Flying flag could be either
@@ -71,21 +99,52 @@ class Parameter:
         
         return "EffectConfig"
     
-    def _guess_update_freq(self) -> str:
-        """Heuristic guess at update frequency"""
-        name_lower = self.name.lower()
-        
+    @staticmethod
+    def _classify_update_freq(name_lower: str, is_pos: bool) -> str:
         if name_lower == 'time':
             return "per-frame"
-        if any(x in name_lower for x in ['camera', 'forward', 'up', 'viewproj', 'invviewproj']):
+        if _RE_PER_FRAME.search(name_lower):
             return "per-frame"
-        if any(x in name_lower for x in ['centerx', 'centery', 'centerz', 'radius']):
+        if is_pos:
             return "per-frame?"
         if 'reserved' in name_lower:
             return "never"
         return "on-change"
 
 
+# abs_path -> (mtime, spans, includes) of every shader file scanned so far
+_PREPROCESS_CACHE: dict[str, tuple[float, tuple[str, ...], tuple[str, ...]]] = {}
+
+
+def _scan_file(abs_path: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Read a shader file and split it at its #include lines, reusing the cached
+    scan while the file's mtime is unchanged.
+    
+    Returns (spans, includes) with len(spans) == len(includes) + 1. Only the
+    scan is cached: the expansion depends on which files the root has already
+    included (repeats are skipped), so it is redone per preprocess_shader() call.
+    """
+    mtime = os.path.getmtime(abs_path)
+    cached = _PREPROCESS_CACHE.get(abs_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+    
+    text = Path(abs_path).read_text(encoding='utf-8')
+    
+    spans = []
+    includes = []
+    last_end = 0
+    for match in _RE_INCLUDE.finditer(text):
+        spans.append(text[last_end:match.start()])
+        includes.append(match.group(1))
+        last_end = match.end()
+    spans.append(text[last_end:])
+    
+    _PREPROCESS_CACHE[abs_path] = (mtime, tuple(spans), tuple(includes))
+    return tuple(spans), tuple(includes)
+
+
 def preprocess_shader(file_path: str, included_files: Optional[set] = None, quiet: bool = True) -> str:
     """
     Recursively preprocess a shader file, expanding #include directives.
@@ -93,37 +152,38 @@ def preprocess_shader(file_path: str, included_files: Optional[set] = None, quie
     """
     if included_files is None:
         included_files = set()
-    
+    out: List[str] = []
+    _expand(file_path, out, included_files, quiet)
+    return "".join(out)
+
+
+def _expand(file_path: str, out: List[str], included_files: set, quiet: bool) -> None:
+    """Append the expansion of file_path to out; joined once by preprocess_shader()"""
     abs_path = os.path.abspath(file_path)
     if abs_path in included_files:
-        return f"// SKIPPED CIRCULAR INCLUDE: {file_path}\n"
+        out.append(f"// SKIPPED CIRCULAR INCLUDE: {file_path}\n")
+        return
     
     included_files.add(abs_path)
     base_dir = os.path.dirname(file_path)
-    processed_lines = []
     
     if not quiet:
         print(f"{CYAN}Processing: {os.path.basename(file_path)}{RESET}")
     
     try:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
+        spans, includes = _scan_file(abs_path)
     except FileNotFoundError:
         print(f"{RED}Error: Include file not found: {file_path}{RESET}")
-        return f"// ERROR: FILE NOT FOUND {file_path}\n"
-
-    for line in lines:
-        match = re.match(r'^\s*#include\s+"([^"]+)"', line)
-        if match:
-            include_rel_path = match.group(1)
-            include_full_path = os.path.join(base_dir, include_rel_path)
-            processed_lines.append(f"// >>> INCLUDE START: {include_rel_path}\n")
-            processed_lines.append(preprocess_shader(include_full_path, included_files, quiet))
-            processed_lines.append(f"// <<< INCLUDE END: {include_rel_path}\n")
-        else:
-            processed_lines.append(line)
-            
-    return "".join(processed_lines)
+        out.append(f"// ERROR: FILE NOT FOUND {file_path}\n")
+        return
+    
+    out.append(spans[0])
+    for include_rel_path, span in zip(includes, spans[1:]):
+        include_full_path = os.path.join(base_dir, include_rel_path)
+        out.append(f"// >>> INCLUDE START: {include_rel_path}\n")
+        _expand(include_full_path, out, included_files, quiet)
+        out.append(f"// <<< INCLUDE END: {include_rel_path}\n")
+        out.append(span)
 
 
 def parse_glsl_uniform_block(content: str, block_name: str = None) -> List[Parameter]:
@@ -140,169 +200,147 @@ def parse_glsl_uniform_block(content: str, block_name: str = None) -> List[Param
     in_uniform_block = False
     target_block = block_name
     
-    lines = content.split('\n')
+    # True when the previous line was a ═══ rule inside the block; the
+    # comment line right after a rule names the next section
+    after_rule = False
     
-    for i, line in enumerate(lines):
+    for line in content.splitlines():
         stripped = line.strip()
+        if not stripped:
+            after_rule = False
+            continue
         
-        # Check for uniform block start
+        # Check for uniform block start (substring test first; most lines
+        # before the block cannot start one)
         if not in_uniform_block:
-            match = re.match(r'layout\s*\(\s*std140\s*\)\s*uniform\s+(\w+)\s*\{', stripped)
+            match = 'std140' in stripped and _RE_BLOCK_START.match(stripped)
             if match:
                 found_block = match.group(1)
                 if target_block is None or found_block == target_block:
                     in_uniform_block = True
                     target_block = found_block
                     print(f"{GREEN}Found uniform block: {found_block}{RESET}")
-                continue
+            continue
+        
+        # Inside the block: check for block end
+        if stripped.startswith('}'):
+            break
         
-        if in_uniform_block:
-            # Check for block end
-            if stripped.startswith('}'):
-                break
-            
-            # Check for section header (═══ pattern)
-            if '═══' in line:
-                # Look at next line for section name
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    if next_line.startswith('//'):
-                        section_text = next_line.lstrip('/').strip()
-                        if section_text and '═' not in section_text:
-                            current_section = section_text
-                            print(f"  Section: {section_text}")
-            
-            # Check for slot comment (// vec4 N: ...)
-            slot_match = re.match(r'//\s*vec4\s+(\d+):', stripped)
+        # Check for section header (comment following a ═══ rule)
+        if after_rule and stripped.startswith('//'):
+            section_text = stripped.lstrip('/').strip()
+            if section_text and '═' not in section_text:
+                current_section = section_text
+                print(f"  Section: {section_text}")
+        after_rule = '═══' in line
+        
+        # Check for slot comment (// vec4 N: ... or // mat4 (vec4 N-M): ...)
+        if stripped.startswith('//'):
+            slot_match = _RE_SLOT.match(stripped)
             if slot_match:
-                current_slot = int(slot_match.group(1))
-            
-            # Check for mat4 slot comment (// mat4 (vec4 N-M): ...)
-            mat_slot_match = re.match(r'//\s*mat4\s*\(vec4\s*(\d+)-(\d+)\):', stripped)
-            if mat_slot_match:
-                current_slot = int(mat_slot_match.group(1))
-            
-            # Check for float declaration
-            float_match = re.match(r'float\s+(\w+)\s*;\s*(?://\s*(.*))?', stripped)
-            if float_match:
-                name = float_match.group(1)
-                comment = (float_match.group(2) or "").strip()
-                parameters.append(Parameter(
-                    slot=current_slot,
-                    name=name,
-                    glsl_type="float",
-                    section=current_section,
-                    comment=comment
-                ))
-            
-            # Check for mat4 declaration
-            mat_match = re.match(r'mat4\s+(\w+)\s*;\s*(?://\s*(.*))?', stripped)
-            if mat_match:
-                name = mat_match.group(1)
-                comment = (mat_match.group(2) or "").strip()
-                parameters.append(Parameter(
-                    slot=current_slot,
-                    name=name,
-                    glsl_type="mat4",
-                    section=current_section,
-                    comment=f"(4 slots) {comment}"
-                ))
+                current_slot = int(slot_match.group('vec4') or slot_match.group('mat4'))
+            continue
+        
+        # Check for float / mat4 / vec2-4 declaration
+        if not stripped.startswith(_DECL_PREFIXES):
+            continue
+        decl_match = _RE_DECL.match(stripped)
+        if decl_match:
+            comment = (decl_match.group('comment') or "").strip()
+            if decl_match.group('float'):
+                glsl_type = "float"
+            elif decl_match.group('mat4'):
+                glsl_type = "mat4"
+                comment = f"(4 slots) {comment}"
+            else:
+                glsl_type = decl_match.group('vec')
+            parameters.append(Parameter(
+                slot=current_slot,
+                name=decl_match.group('name'),
+                glsl_type=glsl_type,
+                section=current_section,
+                comment=comment
+            ))
+            if glsl_type == "mat4":
                 current_slot += 4
-            
-            # Check for vec2/vec3/vec4 declarations (if any)
-            vec_match = re.match(r'(vec[234])\s+(\w+)\s*;\s*(?://\s*(.*))?', stripped)
-            if vec_match:
-                vec_type = vec_match.group(1)
-                name = vec_match.group(2)
-                comment = (vec_match.group(3) or "").strip()
-                parameters.append(Parameter(
-                    slot=current_slot,
-                    name=name,
-                    glsl_type=vec_type,
-                    section=current_section,
-                    comment=comment
-                ))
     
     return parameters
 
 
-def generate_markdown_report(parameters: List[Parameter], source_file: str, block_name: str) -> str:
-    """Generate markdown classification table"""
+def generate_markdown_report(parameters: List[Parameter], source_file: str, block_name: str,
+                             write: Callable[[str], object]) -> None:
+    """Generate markdown classification table, streaming it through write()"""
     
-    lines = [
-        "# UBO Parameter Classification - Phase 0 Audit",
-        "",
-        f"> **Source:** `{source_file}`",
-        f"> **Uniform Block:** `{block_name}`",
-        f"> **Total Parameters:** {len(parameters)}",
-        "> ",
-        "> **Instructions:** Review and confirm the `Domain Target` and `Update Freq` columns.",
-        "> Values marked with `**bold**` or `?` are suggestions that need verification.",
-        "",
-        "---",
-        "",
-        "## Domain Legend",
-        "",
-        "| Domain | Description | Update Policy |",
-        "|--------|-------------|---------------|",
-        "| **Frame** | Global per-frame drivers | Every frame |",
-        "| **Camera** | View definition and matrices | Every frame |",
-        "| **Object** | Per-instance identity/transform | Per draw (future) |",
-        "| **EffectConfig** | Preset/style parameters | On preset change |",
-        "| **EffectRuntime** | Per-frame instance state | Per frame (if CPU-driven) |",
-        "| **Debug** | Debug flags and values | Dev only |",
-        "| **REMOVE** | Candidate for removal | N/A |",
-        "",
-        "---",
-        "",
-        "## Parameter Classification",
-        "",
-        "| Slot | Name | Section | Domain Target | Update Freq | Notes |",
-        "|------|------|---------|---------------|-------------|-------|",
-    ]
+    write("# UBO Parameter Classification - Phase 0 Audit\n"
+          "\n"
+          f"> **Source:** `{source_file}`\n"
+          f"> **Uniform Block:** `{block_name}`\n"
+          f"> **Total Parameters:** {len(parameters)}\n"
+          "> \n"
+          "> **Instructions:** Review and confirm the `Domain Target` and `Update Freq` columns.\n"
+          "> Values marked with `**bold**` or `?` are suggestions that need verification.\n"
+          "\n"
+          "---\n"
+          "\n"
+          "## Domain Legend\n"
+          "\n"
+          "| Domain | Description | Update Policy |\n"
+          "|--------|-------------|---------------|\n"
+          "| **Frame** | Global per-frame drivers | Every frame |\n"
+          "| **Camera** | View definition and matrices | Every frame |\n"
+          "| **Object** | Per-instance identity/transform | Per draw (future) |\n"
+          "| **EffectConfig** | Preset/style parameters | On preset change |\n"
+          "| **EffectRuntime** | Per-frame instance state | Per frame (if CPU-driven) |\n"
+          "| **Debug** | Debug flags and values | Dev only |\n"
+          "| **REMOVE** | Candidate for removal | N/A |\n"
+          "\n"
+          "---\n"
+          "\n"
+          "## Parameter Classification\n"
+          "\n"
+          "| Slot | Name | Section | Domain Target | Update Freq | Notes |\n"
+          "|------|------|---------|---------------|-------------|-------|\n")
     
-    # Group by slot
-    current_slot = -1
-    for param in parameters:
-        if param.slot != current_slot:
-            if current_slot != -1:
-                lines.append("|---|---|---|---|---|---|")
-            current_slot = param.slot
-        lines.append(param.to_row())
+    # Group by slot, with a separator row between consecutive slot groups
+    write("|---|---|---|---|---|---|\n".join(
+        "".join(f"{param.to_row()}\n" for param in group)
+        for _, group in groupby(parameters, key=attrgetter('slot'))
+    ))
     
     # Summary by domain
-    lines.extend([
-        "",
-        "---",
-        "",
-        "## Summary by Suggested Domain",
-        "",
-    ])
+    write("\n"
+          "---\n"
+          "\n"
+          "## Summary by Suggested Domain\n"
+          "\n")
     
     domain_counts = {}
     for p in parameters:
-        domain = p._guess_domain()
+        domain = p._classify()[0]
         domain_counts[domain] = domain_counts.get(domain, 0) + 1
     
     for domain, count in sorted(domain_counts.items(), key=lambda x: -x[1]):
-        lines.append(f"- {domain}: {count} parameters")
+        write(f"- {domain}: {count} parameters\n")
     
     # Next steps
-    lines.extend([
-        "",
-        "---",
-        "",
-        "## Next Steps",
-        "",
-        "1. ✅ Review each parameter classification",
-        "2. ✅ Confirm update frequencies",
-        "3. ✅ Identify consolidation opportunities (e.g., X/Y/Z/W → vec4)",
-        "4. ⬜ Group by target UBO",
-        "5. ⬜ Create new UBO record definitions",
-        "6. ⬜ Update shader uniform blocks",
-    ])
-    
-    return '\n'.join(lines)
+    write("\n"
+          "---\n"
+          "\n"
+          "## Next Steps\n"
+          "\n"
+          "1. ✅ Review each parameter classification\n"
+          "2. ✅ Confirm update frequencies\n"
+          "3. ✅ Identify consolidation opportunities (e.g., X/Y/Z/W → vec4)\n"
+          "4. ⬜ Group by target UBO\n"
+          "5. ⬜ Create new UBO record definitions\n"
+          "6. ⬜ Update shader uniform blocks\n")
+
+
+def render_markdown_report(parameters: List[Parameter], source_file: str, block_name: str) -> str:
+    """Generate the markdown classification table into a string"""
+    buf = io.StringIO()
+    generate_markdown_report(parameters, source_file, block_name, buf.write)
+    return buf.getvalue()
 
 
 def main():
@@ -337,7 +375,7 @@ def main():
     
     # Get content (with or without preprocessing)
     if args.no_preprocess:
-        content = glsl_path.read_text()
+        content = glsl_path.read_text(encoding='utf-8')
     else:
         content = preprocess_shader(str(glsl_path), quiet=True)
     
@@ -347,23 +385,22 @@ def main():
     parameters = parse_glsl_uniform_block(content, args.block)
     
     if not parameters:
-        print(f"{YELLOW}Warning: No parameters found in uniform block{RESET}", file=sys.stderr)
-        print(f"{YELLOW}Try specifying --block <name> or check if file has std140 uniform blocks{RESET}")
+        print(f"{YELLOW}Warning: No parameters found in uniform block "
+              f"(try --block <name> or check the file has std140 uniform blocks){RESET}", file=sys.stderr)
     else:
         print(f"{GREEN}Found {len(parameters)} parameters{RESET}")
     
     # Determine block name
     block_name = args.block or "FieldVisualConfig"
     
-    # Generate report
-    report = generate_markdown_report(parameters, str(glsl_path), block_name)
-    
-    # Output
+    # Generate report straight into the output file; a terminal stdout is
+    # line-buffered, so build the report in memory and write it in one call
     if args.output:
-        Path(args.output).write_text(report)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            generate_markdown_report(parameters, str(glsl_path), block_name, f.write)
         print(f"{GREEN}Report written to: {args.output}{RESET}")
     else:
-        print(report)
+        sys.stdout.write(render_markdown_report(parameters, str(glsl_path), block_name))
 
 
 if __name__ == "__main__":